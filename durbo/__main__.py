@@ -1,19 +1,26 @@
 import asyncio
 import logging
+import os
 import sys
+import time
 import toml
 
 from tempfile import gettempdir
+from typing import List
 
 from telethon import tl
 
 from .tgsyncer import TgSyncer
 from .fbsyncer import FbSyncer, FbMessageData
+from .admin import AdminCommands
+from .media import MediaTranscoder
+from .stats import RelayStats
+from .utils import relay_signature, with_reactions
 
 from .config.logging import setup_logging
 
-from .data.base import database, init as init_db
-from .data.models import MessageData
+from .data.base import init as init_db
+from .data.models import MessageData, create_tables
 
 # import code; code.interact(local=dict(globals(), **locals()))
 
@@ -26,13 +33,17 @@ config = toml.load("data/config.toml")
 dbname = config["database"]["name"]
 tgconf = config["telegram"]
 fbconf = config["facebook"]
+mediaconf = config.get("media", {})
 
 log.info("Initializing database")
 init_db(dbname)
-database.create_tables([MessageData])
+create_tables()
 
 tg = TgSyncer(tgconf)
 fb = FbSyncer(fbconf)
+transcoder = MediaTranscoder(mediaconf)
+stats = RelayStats()
+admin = AdminCommands(stats, transcoder, dbname)
 
 TG_DICE_STUFF = {
     "format": "{name} {action} a {type}: {value}",
@@ -58,6 +69,16 @@ TG_DICE_STUFF = {
 
 
 async def tg_callback(message: tl.types.Message):
+    if admin.is_paused("tg->fb"):
+        log.debug("Relaying from Telegram is paused, dropping %s", message.id)
+        return
+
+    start = time.perf_counter()
+    data = await _relay_tg_message(message)
+    _log_relayed("tg->fb", message.id, data.fb_message_id, start)
+
+
+async def _relay_tg_message(message: tl.types.Message) -> MessageData:
     sender = message.sender
     sender_id = sender.id
     sender_name = (
@@ -72,8 +93,12 @@ async def tg_callback(message: tl.types.Message):
         text = "[Telegram poll, please go to the Telegram group to interact]"
     elif message.game:
         text = "[Telegram game, please go to the Telegram group to interact]"
-    elif message.sticker:
-        text = "[webp image unsupported by Facebook, please go to the Telegram group to view]"
+    elif message.sticker and not _can_relay_sticker(message):
+        kind = "webp image" if _is_static_sticker(message) else "Animated sticker"
+        text = (
+            f"[{kind} unsupported by Facebook, "
+            "please go to the Telegram group to view]"
+        )
     elif message.dice:
         emoji = message.dice.emoticon
         value = message.dice.value
@@ -96,10 +121,13 @@ async def tg_callback(message: tl.types.Message):
 
     media_path = None
 
-    if (message.photo or message.document) and not message.sticker:
+    if message.sticker and _can_relay_sticker(message):
+        media_path = await _download_sticker(message)
+    elif (message.photo or message.document) and not message.sticker:
         log.info("Message has a file attached, downloading it")
-        media_path = await message.download_media(gettempdir())
+        media_path = await message.download_media(_download_path(message))
         log.info("Message media downloaded to %s", media_path)
+        media_path = await transcoder.transcode(media_path, "facebook")
 
     sent_message = fb.send_text(f"<{sender_name}>\n{text}", reply_to_id, media_path)
 
@@ -110,13 +138,53 @@ async def tg_callback(message: tl.types.Message):
         fb_message_id=sent_message.id,
         fb_sender_id=sent_message.author_id,
         fb_thread_id=sent_message.thread_id,
+        tg_signature=_tg_signature(message),
     )
 
     data.save()
 
+    return data
+
+
+def _tg_signature(message: tl.types.Message) -> str:
+    media = message.photo or message.document
+    return relay_signature(message.raw_text, media.id if media else None)
+
+
+def _download_path(message: tl.types.Message) -> str:
+    # Telethon adds the extension, the prefix keeps it with our other temp files
+    media = message.photo or message.document
+    return os.path.join(gettempdir(), f"durbo_tg_{media.id}")
+
+
+def _is_static_sticker(message: tl.types.Message) -> bool:
+    return message.file.mime_type == "image/webp"
+
+
+def _can_relay_sticker(message: tl.types.Message) -> bool:
+    return transcoder.enabled and _is_static_sticker(message)
+
+
+async def _download_sticker(message: tl.types.Message) -> str:
+    key = f"tg-sticker-{message.sticker.id}"
+    cached = transcoder.get_cached(key, "facebook")
+    if cached:
+        log.debug("Using cached sticker %s", cached)
+        return cached
+
+    log.info("Message has a sticker, downloading it")
+    sticker_path = await message.download_media(_download_path(message))
+    log.info("Sticker downloaded to %s", sticker_path)
+    return await transcoder.transcode(sticker_path, "facebook", key)
+
 
 async def fb_callback(message: FbMessageData):
     log.debug("Facebook message callback")
+    if admin.is_paused("fb->tg"):
+        log.debug("Relaying from Facebook is paused, dropping %s", message.id)
+        return
+
+    start = time.perf_counter()
 
     sender_id = message.author_id
 
@@ -130,11 +198,15 @@ async def fb_callback(message: FbMessageData):
         if stored_data:
             reply_to = stored_data.tg_message_id
 
+    file_paths = [
+        await transcoder.transcode(path, "telegram") for path in message.file_paths
+    ]
+
     log.debug("Proxying message to telegram")
     sent_messages = await tg.send_text(
         f"<**{message.author_name}**>\n{message.message_object.text or ''}",
         reply_to,
-        message.file_paths,
+        file_paths,
     )
 
     tg_sender_id = await tg.get_my_id()
@@ -151,9 +223,122 @@ async def fb_callback(message: FbMessageData):
 
         data.save()
 
+    _log_relayed("fb->tg", message.id, [m.id for m in sent_messages], start)
+
+
+def _log_relayed(direction: str, source_id, target_id, start: float) -> None:
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    stats.record(direction, elapsed_ms)
+    log.info(
+        "Relayed %s message %s in %.1f ms",
+        direction,
+        source_id,
+        elapsed_ms,
+        extra={
+            "direction": direction,
+            "msg_id": source_id,
+            "target_msg_id": target_id,
+            "elapsed_ms": round(elapsed_ms, 1),
+        },
+    )
+
+
+async def tg_edit_callback(message: tl.types.Message):
+    if admin.is_paused("tg->fb"):
+        return
+
+    rows = MessageData.for_tg_messages([message.id], message.chat_id)
+    fb_ids = [row.fb_message_id for row in rows if row.fb_sender_id == fb.uid]
+
+    if not fb_ids:
+        log.debug("No relayed copy of edited message %s", message.id)
+        return
+
+    signature = _tg_signature(message)
+    if all(row.tg_signature == signature for row in rows):
+        log.debug("Text and media of %s unchanged, not replacing", message.id)
+        return
+
+    # Messenger has no message editing, so replace the copy instead. The new
+    # copy goes out first so a failed relay leaves the old one in place.
+    log.debug("Replacing Facebook copies %s of edited message", fb_ids)
+    await _relay_tg_message(message)
+    await loop.run_in_executor(None, fb.unsend_messages, fb_ids)
+    MessageData.delete_fb_messages(row.fb_message_id for row in rows)
+
+
+async def tg_delete_callback(message_ids: List[int], chat_id: int = None):
+    if admin.is_paused("tg->fb"):
+        return
+
+    rows = MessageData.for_tg_messages(message_ids, chat_id)
+
+    if not rows:
+        return
+
+    fb_ids = list({row.fb_message_id for row in rows if row.fb_sender_id == fb.uid})
+    if fb_ids:
+        await loop.run_in_executor(None, fb.unsend_messages, fb_ids)
+
+    MessageData.delete_tg_messages(message_ids, chat_id)
+
+
+async def fb_unsend_callback(message_id: str):
+    if admin.is_paused("fb->tg"):
+        return
+
+    rows = MessageData.for_fb_message(message_id)
+
+    if not rows:
+        return
+
+    tg_sender_id = await tg.get_my_id()
+    tg_ids = [row.tg_message_id for row in rows if row.tg_sender_id == tg_sender_id]
+    if tg_ids:
+        await tg.delete_messages(tg_ids)
+
+    MessageData.delete_fb_messages([message_id])
+
+
+async def fb_reaction_callback(message_id: str):
+    if admin.is_paused("fb->tg"):
+        return
+
+    tg_sender_id = await tg.get_my_id()
+    rows = [
+        row
+        for row in MessageData.for_fb_message(message_id)
+        if row.tg_sender_id == tg_sender_id
+    ]
+
+    if not rows:
+        log.debug("No editable Telegram copy of %s to add reactions to", message_id)
+        return
+
+    reactions = await loop.run_in_executor(None, fb.fetch_reactions, message_id)
+
+    # Attachments are relayed as one message each, the first one gets the summary
+    tg_message = await tg.get_message(min(row.tg_message_id for row in rows))
+    if not tg_message:
+        return
+
+    text = with_reactions(tg_message.text, reactions)
+    if text != tg_message.text:
+        await tg.edit_text(tg_message.id, text)
+
+
+async def command_callback(text: str):
+    return admin.handle(text)
+
 
 tg.set_simple_callback(tg_callback)
+tg.set_command_callback(command_callback)
+tg.set_edit_callback(tg_edit_callback)
+tg.set_delete_callback(tg_delete_callback)
 fb.set_simple_callback(fb_callback)
+fb.set_unsend_callback(fb_unsend_callback)
+fb.set_reaction_callback(fb_reaction_callback)
+fb.set_command_callback(command_callback)
 
 loop = asyncio.get_event_loop()
 
@@ -177,6 +362,7 @@ async def _amain() -> None:
     finally:
         await tg.stop()
         fb.stop()
+        transcoder.shutdown()
 
 
 def main() -> None:
@@ -186,6 +372,7 @@ def main() -> None:
         log.info("User pressed Ctrl-C, exiting")
         loop.run_until_complete(tg.stop())
         fb.stop()
+        transcoder.shutdown()
     except:  # noqa: E722
         info = sys.exc_info()[0]
         log.critical("Unexpected error", exc_info=info)
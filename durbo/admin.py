@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import os
+from tempfile import gettempdir
+from typing import Optional, Tuple
+
+from .config.logging import queue_size
+from .data.models import MessageData
+from .media import MediaTranscoder
+from .stats import RelayStats
+
+DIRECTIONS = {"tg": "tg->fb", "fb": "fb->tg"}
+
+HELP = """Commands:
+/stats - relay latency and counts
+/queue - pending work
+/cache - cache, database and temp dir usage
+/flush - clear caches and latency samples
+/pause tg|fb - stop relaying messages and changes to them from one side
+/resume tg|fb - resume relaying"""
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+    return f"{size:.1f} GiB"
+
+
+def _temp_usage() -> Tuple[int, int]:
+    count = 0
+    size = 0
+    with os.scandir(gettempdir()) as entries:
+        for entry in entries:
+            if entry.name.startswith("durbo_") and entry.is_file():
+                count += 1
+                size += entry.stat().st_size
+
+    return count, size
+
+
+class AdminCommands:
+    def __init__(
+        self,
+        stats: RelayStats,
+        transcoder: MediaTranscoder,
+        db_path: str,
+        loop: asyncio.AbstractEventLoop = None,
+    ) -> None:
+        self._log = logging.getLogger(__name__)
+        self._loop = loop or asyncio.get_event_loop()
+        self._stats = stats
+        self._transcoder = transcoder
+        self._db_path = db_path
+        self._paused = set()
+
+    def is_paused(self, direction: str) -> bool:
+        return direction in self._paused
+
+    def handle(self, text: str) -> Optional[str]:
+        """Runs the command in ``text``, returns the reply to send or
+        ``None`` if it is not an admin command.
+        """
+        if not text or not text.startswith("/"):
+            return None
+
+        command, *args = text.split()
+        # Telegram appends the bot name to commands picked from the menu
+        name = command[1:].split("@")[0]
+        handler = getattr(self, f"_cmd_{name}", None)
+        if not handler:
+            return None
+
+        self._log.info("Running admin command %s", text)
+        return handler(*args)
+
+    def _cmd_help(self, *args) -> str:
+        return HELP
+
+    def _cmd_stats(self, *args) -> str:
+        lines = []
+        for direction in sorted(self._stats.directions()):
+            percentiles = self._stats.percentiles(direction)
+            summary = ", ".join(f"p{p} {ms:.0f} ms" for p, ms in percentiles.items())
+            paused = " (paused)" if self.is_paused(direction) else ""
+            count = self._stats.count(direction)
+            lines.append(f"{direction}{paused}: {count} relayed, {summary}")
+
+        return "\n".join(lines) or "Nothing relayed yet"
+
+    def _cmd_queue(self, *args) -> str:
+        return "\n".join(
+            (
+                f"Event loop tasks: {len(asyncio.all_tasks(self._loop))}",
+                f"Pending transcodes: {self._transcoder.pending}",
+                f"Log records queued: {queue_size()}",
+                f"Paused: {', '.join(sorted(self._paused)) or 'none'}",
+            )
+        )
+
+    def _cmd_cache(self, *args) -> str:
+        hits = self._transcoder.hits
+        lookups = hits + self._transcoder.misses
+        hit_rate = f"{hits / lookups:.0%}" if lookups else "n/a"
+
+        if os.path.exists(self._db_path):
+            db_size = _format_bytes(os.path.getsize(self._db_path))
+        else:
+            db_size = "in memory"
+
+        cache_size = self._transcoder.cache_size
+        temp_count, temp_size = _temp_usage()
+
+        return "\n".join(
+            (
+                f"Transcode cache: {cache_size} entries, {hit_rate} hit rate",
+                f"Database: {db_size}, {MessageData.select().count()} mapped messages",
+                f"Temp files: {temp_count} ({_format_bytes(temp_size)})",
+            )
+        )
+
+    def _cmd_flush(self, *args) -> str:
+        self._transcoder.clear_cache()
+        self._stats.reset()
+        return "Caches and stats flushed"
+
+    def _cmd_pause(self, *args) -> str:
+        return self._set_paused(args, True)
+
+    def _cmd_resume(self, *args) -> str:
+        return self._set_paused(args, False)
+
+    def _set_paused(self, args, paused: bool) -> str:
+        direction = DIRECTIONS.get(args[0]) if args else None
+        if not direction:
+            return "Usage: /pause tg|fb or /resume tg|fb"
+
+        if paused:
+            self._paused.add(direction)
+        else:
+            self._paused.discard(direction)
+
+        state = "paused" if paused else "resumed"
+        self._log.info("Relaying %s %s", direction, state)
+        return f"Relaying {direction} {state}"
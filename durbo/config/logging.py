@@ -1,11 +1,86 @@
+import atexit
+import copy
+import json
 import logging
 import logging.config
+import logging.handlers
+import queue
+import random
 import toml
 
 from typing import Union
 
 DEFAULT_LOG_CONFIG_PATH = "data/logging.toml"
 
+# Attributes present on every LogRecord, anything else was passed as extra.
+RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__.keys()
+) | {"message", "asctime"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+
+        if record.exc_text:
+            data["exception"] = record.exc_text
+
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class BodyFilter(logging.Filter):
+    """Truncates and samples message bodies passed as ``extra={"body": ...}``.
+
+    Only ``sample_rate`` of the records keep their body, the rest just record
+    its length.
+    """
+
+    def __init__(self, max_length: int = 200, sample_rate: float = 1.0) -> None:
+        super().__init__()
+        self._max_length = max_length
+        self._sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        body = getattr(record, "body", None)
+        if body is None:
+            return True
+
+        record.body_length = len(body)
+
+        if self._sample_rate < 1 and random.random() >= self._sample_rate:
+            record.body = None
+        elif len(body) > self._max_length:
+            record.body = body[: self._max_length] + "…"
+
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Only merges the message arguments on the calling thread, formatting
+    (tracebacks included) is left to the handlers behind the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
 
 def setup_logging(config: Union[str, dict] = None) -> None:
     if not config:
@@ -14,6 +89,49 @@ def setup_logging(config: Union[str, dict] = None) -> None:
     if not isinstance(config, dict):
         config = toml.load(config)
 
-    config = config.get("logging", config)
+    config = dict(config.get("logging", config))
+    use_queue = config.pop("queue", True)
 
     logging.config.dictConfig(config)
+
+    if use_queue:
+        _start_queue()
+
+
+def stop_logging() -> None:
+    global _listener
+
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+def queue_size() -> int:
+    return _listener.queue.qsize() if _listener else 0
+
+
+def _start_queue() -> None:
+    """Moves the root handlers behind a queue so logging never blocks callers
+    on handler I/O, the handlers run on the listener thread instead.
+    """
+    global _listener
+
+    stop_logging()
+
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    if not handlers:
+        return
+
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    root.addHandler(DeferredQueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+atexit.register(stop_logging)
@@ -1,6 +1,12 @@
-from peewee import IntegerField, CharField
+from typing import Iterable, List
 
-from .base import BaseModel
+from peewee import IntegerField, CharField, chunked
+from playhouse.migrate import SqliteMigrator, migrate
+
+from .base import BaseModel, database
+
+# Stay well below SQLite's limit on the number of bound variables
+MAX_QUERY_IDS = 500
 
 
 class MessageData(BaseModel):
@@ -10,6 +16,64 @@ class MessageData(BaseModel):
     fb_message_id = CharField(index=True)
     fb_sender_id = CharField(index=True)
     fb_thread_id = CharField(index=True)
+    tg_signature = CharField(null=True)
 
     class Meta:
-        indexes = ((("tg_message_id", "fb_message_id"), True),)
+        indexes = (
+            (("tg_message_id", "fb_message_id"), True),
+            (("tg_chat_id", "tg_message_id"), False),
+        )
+
+    @classmethod
+    def for_tg_messages(
+        cls, message_ids: Iterable[int], chat_id: int = None
+    ) -> List["MessageData"]:
+        rows = []
+        for ids in chunked(message_ids, MAX_QUERY_IDS):
+            rows.extend(cls._where_tg_messages(cls.select(), ids, chat_id))
+
+        return rows
+
+    @classmethod
+    def for_fb_message(cls, message_id: str) -> List["MessageData"]:
+        return list(cls.select().where(cls.fb_message_id == message_id))
+
+    @classmethod
+    def delete_tg_messages(cls, message_ids: Iterable[int], chat_id: int = None) -> int:
+        deleted = 0
+        for ids in chunked(message_ids, MAX_QUERY_IDS):
+            deleted += cls._where_tg_messages(cls.delete(), ids, chat_id).execute()
+
+        return deleted
+
+    @classmethod
+    def delete_fb_messages(cls, message_ids: Iterable[str]) -> int:
+        deleted = 0
+        for ids in chunked(message_ids, MAX_QUERY_IDS):
+            deleted += cls.delete().where(cls.fb_message_id.in_(ids)).execute()
+
+        return deleted
+
+    @classmethod
+    def _where_tg_messages(cls, query, message_ids: List[int], chat_id: int = None):
+        query = query.where(cls.tg_message_id.in_(message_ids))
+        if chat_id is not None:
+            query = query.where(cls.tg_chat_id == chat_id)
+
+        return query
+
+
+def create_tables() -> None:
+    database.create_tables([MessageData])
+
+    # Add columns introduced after the table was first created
+    table = MessageData._meta.table_name
+    columns = {column.name for column in database.get_columns(table)}
+    missing = [
+        field
+        for field in MessageData._meta.sorted_fields
+        if field.column_name not in columns
+    ]
+    if missing:
+        migrator = SqliteMigrator(database)
+        migrate(*(migrator.add_column(table, f.column_name, f) for f in missing))
@@ -1,10 +1,11 @@
 import asyncio
 import logging
-from pprint import pprint
+from collections import Counter
 from tempfile import mkstemp
 
 from concurrent.futures.thread import ThreadPoolExecutor
 from inspect import isawaitable
+from typing import Any, List
 
 import fbchat
 from fbchat import Client as FbClient
@@ -101,6 +102,10 @@ class FbSyncer(FbClient):
         self._log = logging.getLogger(__name__)
         self._loop = loop or asyncio.get_event_loop()
         self._master_id = config["master_id"]
+        self._simple_callback = None
+        self._unsend_callback = None
+        self._reaction_callback = None
+        self._command_callback = None
         user = config["user"]
         email = user["email"]
         password = user["password"]
@@ -141,6 +146,15 @@ class FbSyncer(FbClient):
     def set_simple_callback(self, callback: callable) -> None:
         self._simple_callback = callback
 
+    def set_unsend_callback(self, callback: callable) -> None:
+        self._unsend_callback = callback
+
+    def set_reaction_callback(self, callback: callable) -> None:
+        self._reaction_callback = callback
+
+    def set_command_callback(self, callback: callable) -> None:
+        self._command_callback = callback
+
     @memoize
     def get_thread_type(self, thread_id: str) -> ThreadType:
         thread = self.fetchThreadInfo(thread_id)[thread_id]
@@ -152,7 +166,12 @@ class FbSyncer(FbClient):
         target_id = self._group_id
         target_type = self.get_thread_type(target_id)
         message = Message(text=text, reply_to_id=reply_to_id)
-        self._log.info('Sending "%s" to %s (%s)', text, target_id, target_type)
+        self._log.info(
+            "Sending message to %s (%s)",
+            target_id,
+            target_type,
+            extra={"chat_id": target_id, "reply_to_id": reply_to_id, "body": text},
+        )
 
         if media_path:
             self._log.debug("Sending file %s to messenger", media_path)
@@ -167,6 +186,15 @@ class FbSyncer(FbClient):
 
         return FbSentMessage(sent_id, self.uid, text, target_id, target_type)
 
+    def fetch_reactions(self, message_id: str) -> Counter:
+        message = self.fetchMessageInfo(message_id, self._group_id)
+        return Counter(reaction.value for reaction in message.reactions.values())
+
+    def unsend_messages(self, message_ids: List[str]) -> None:
+        self._log.info("Unsending %s messages", len(message_ids))
+        for message_id in message_ids:
+            self.unsend(message_id)
+
     def onMessage(
         self,
         mid,
@@ -179,16 +207,14 @@ class FbSyncer(FbClient):
         msg,
         **kwargs
     ):
-        if self._log.isEnabledFor(logging.DEBUG):
-            self._log.debug(
-                "Received %s from %s in %s (%s) at %s",
-                mid,
-                author_id,
-                thread_id,
-                thread_type,
-                ts,
-            )
-            pprint(message_object)
+        self._log.debug(
+            "Received %s from %s in %s (%s) at %s",
+            mid,
+            author_id,
+            thread_id,
+            thread_type,
+            ts,
+        )
 
         if thread_id != self._group_id:
             self._log.debug("Message not in configured group (%s), ignoring", thread_id)
@@ -252,7 +278,18 @@ class FbSyncer(FbClient):
             **kwargs
         )
 
-        self._log.info("FB [%s] <%s> %s", thread_id, author_name, message_object.text)
+        self._log.info(
+            "FB [%s] <%s> %s",
+            thread_id,
+            author_name,
+            mid,
+            extra={
+                "msg_id": mid,
+                "chat_id": thread_id,
+                "sender_id": author_id,
+                "body": message_object.text,
+            },
+        )
 
         if message_object.text == "/die" and author_id == self._master_id:
             self._log.info("Master requested death, complying")
@@ -261,17 +298,83 @@ class FbSyncer(FbClient):
             self.stop()
             return
 
+        if author_id == self._master_id and self._command_callback:
+            reply = self._run_callback(self._command_callback, message_object.text)
+            if reply:
+                self._log.debug("Replying to master command")
+                self.send(Message(text=reply, reply_to_id=mid), thread_id, thread_type)
+                return
+
         if self._simple_callback:
-            cb = self._simple_callback
             self._log.debug("Calling callback")
-            r = cb(data)
-            if isawaitable(r):
-                self._log.debug("Running coroutine")
-                asyncio.run_coroutine_threadsafe(r, self._loop).result()
+            self._run_callback(self._simple_callback, data)
+
+    def onMessageUnsent(
+        self,
+        mid=None,
+        author_id=None,
+        thread_id=None,
+        thread_type=None,
+        ts=None,
+        msg=None,
+        **kwargs
+    ):
+        if thread_id != self._group_id or author_id == self.uid:
+            return
+
+        self._log.info(
+            "FB [%s] unsent %s",
+            thread_id,
+            mid,
+            extra={"msg_id": mid, "chat_id": thread_id, "sender_id": author_id},
+        )
+
+        if self._unsend_callback:
+            self._run_callback(self._unsend_callback, mid)
+
+    def onReactionAdded(
+        self,
+        mid=None,
+        reaction=None,
+        author_id=None,
+        thread_id=None,
+        thread_type=None,
+        ts=None,
+        msg=None,
+        **kwargs
+    ):
+        self._on_reactions_changed(mid, thread_id)
+
+    def onReactionRemoved(
+        self,
+        mid=None,
+        author_id=None,
+        thread_id=None,
+        thread_type=None,
+        ts=None,
+        msg=None,
+        **kwargs
+    ):
+        self._on_reactions_changed(mid, thread_id)
 
     def onMessageError(self, exception=None, msg=None):
         self._log.error("Exception during message handling", exc_info=exception)
 
+    def _on_reactions_changed(self, mid: str, thread_id: str) -> None:
+        if thread_id != self._group_id or not self._reaction_callback:
+            return
+
+        self._log.debug("Reactions on %s changed", mid)
+        self._run_callback(self._reaction_callback, mid)
+
+    def _run_callback(self, callback: callable, *args) -> Any:
+        r = callback(*args)
+        if isawaitable(r):
+            self._log.debug("Running coroutine")
+            r = asyncio.run_coroutine_threadsafe(r, self._loop).result()
+
+        return r
+
     def _download_sticker(self, sticker: Sticker) -> str:
         if sticker.is_animated == True:
             return self._download_animated_sticker(sticker)
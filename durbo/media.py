@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from tempfile import mkstemp
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+DEFAULT_WORKERS = 2
+DEFAULT_CACHE_SIZE = 256
+
+DEFAULT_LIMITS = {
+    "facebook": {"max_dimension": 2048, "max_bytes": 8 * 1024 * 1024},
+    "telegram": {"max_dimension": 2560, "max_bytes": 10 * 1024 * 1024},
+}
+
+# Formats the target platforms do not render inline, mapped to the format
+# still images get converted to. Animated images are always made into GIFs.
+CONVERT_FORMATS = {"WEBP": "PNG"}
+
+JPEG_QUALITY_STEPS = (90, 80, 70, 60, 50)
+
+
+def _image_digest(path: str) -> Optional[str]:
+    """Hashes the file at ``path``, or returns ``None`` without reading the
+    rest of it when it is not an image PIL can read.
+    """
+    try:
+        with Image.open(path):
+            pass
+    except (IOError, SyntaxError):
+        return None
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(65536), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _save(image: Image.Image, fmt: str, **params) -> str:
+    fd, path = mkstemp(f".{fmt.lower()}", "durbo_")
+    with os.fdopen(fd, "wb") as file:
+        image.save(file, fmt, **params)
+
+    return path
+
+
+def _transcode_animated(image: Image.Image) -> str:
+    frames = []
+    durations = []
+    for index in range(image.n_frames):
+        image.seek(index)
+        frames.append(image.convert("RGBA"))
+        durations.append(image.info.get("duration", 100))
+
+    return _save(
+        frames[0],
+        "GIF",
+        save_all=True,
+        append_images=frames[1:],
+        duration=durations,
+        loop=image.info.get("loop", 0),
+        disposal=2,
+        optimize=True,
+    )
+
+
+def _transcode(src: str, max_dimension: int, max_bytes: int) -> str:
+    """Runs in a worker process, returns the path of the file to upload.
+
+    The source path is returned unchanged when the image is already fit for
+    the target platform, or when it is not an image PIL can read.
+    """
+    try:
+        image = Image.open(src)
+    except (IOError, SyntaxError):
+        return src
+
+    with image:
+        fmt = image.format
+        if getattr(image, "is_animated", False):
+            return _transcode_animated(image) if fmt in CONVERT_FORMATS else src
+
+        target_fmt = CONVERT_FORMATS.get(fmt, fmt)
+        oversized = max(image.size) > max_dimension
+        too_large = os.path.getsize(src) > max_bytes
+
+        if target_fmt == fmt and not oversized and not too_large:
+            return src
+
+        # Re-saving drops the EXIF orientation, so apply it to the pixels
+        image = ImageOps.exif_transpose(image)
+        if oversized:
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        if target_fmt != "JPEG" and not too_large:
+            return _save(image, target_fmt, optimize=True)
+
+        # Only lossy compression reliably brings the byte size down.
+        if image.mode in ("RGBA", "LA", "P"):
+            # JPEG has no alpha, flatten onto white instead of letting
+            # transparent areas turn black
+            image = image.convert("RGBA")
+            background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+            image = Image.alpha_composite(background, image)
+
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        path = None
+        for quality in JPEG_QUALITY_STEPS:
+            if path:
+                os.remove(path)
+            path = _save(image, "JPEG", quality=quality, optimize=True)
+            if os.path.getsize(path) <= max_bytes:
+                break
+
+        return path
+
+
+class MediaTranscoder:
+    def __init__(self, config: dict, loop: asyncio.AbstractEventLoop = None) -> None:
+        self._log = logging.getLogger(__name__)
+        self._loop = loop or asyncio.get_event_loop()
+        self._enabled = config.get("enabled", True)
+        self._cache_size = config.get("cache_size", DEFAULT_CACHE_SIZE)
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._pending = 0
+        self._limits = {
+            platform: {**limits, **config.get(platform, {})}
+            for platform, limits in DEFAULT_LIMITS.items()
+        }
+        self._pool = None
+        if self._enabled:
+            workers = config.get("workers", DEFAULT_WORKERS)
+            self._log.debug("Starting transcoding pool with %s workers", workers)
+            self._pool = ProcessPoolExecutor(max_workers=workers)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def cache_size(self) -> int:
+        return len(self._cache)
+
+    def clear_cache(self) -> None:
+        self._log.info("Clearing %s cached transcodes", len(self._cache))
+        self._cache.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def get_cached(self, key: str, platform: str) -> Optional[str]:
+        cache_key = (key, platform)
+        path = self._cache.get(cache_key)
+        if path is None:
+            return None
+
+        if not os.path.exists(path):
+            del self._cache[cache_key]
+            return None
+
+        self._cache.move_to_end(cache_key)
+        self._hits += 1
+        return path
+
+    async def transcode(self, path: str, platform: str, key: str = None) -> str:
+        """Normalizes the image at ``path`` for upload to ``platform``.
+
+        ``key`` identifies the source media in the cache, if it is not given
+        the file content hash is used.
+        """
+        if not self._enabled:
+            return path
+
+        if key is None:
+            key = await self._loop.run_in_executor(None, _image_digest, path)
+            if key is None:
+                self._log.debug("%s is not an image, sending as is", path)
+                return path
+
+        cached = self.get_cached(key, platform)
+        if cached:
+            self._log.debug("Using cached transcode %s for %s", cached, path)
+            return cached
+
+        limits = self._limits[platform]
+        self._misses += 1
+        self._pending += 1
+        try:
+            result = await self._loop.run_in_executor(
+                self._pool,
+                _transcode,
+                path,
+                limits["max_dimension"],
+                limits["max_bytes"],
+            )
+        except Exception:
+            self._log.exception("Failed to transcode %s, sending as is", path)
+            return path
+        finally:
+            self._pending -= 1
+
+        if result != path:
+            self._log.debug("Transcoded %s to %s for %s", path, result, platform)
+
+        self._store(key, platform, result)
+        return result
+
+    def shutdown(self) -> None:
+        if self._pool:
+            self._log.debug("Shutting down transcoding pool")
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _store(self, key: str, platform: str, path: str) -> None:
+        cache_key = (key, platform)
+        self._cache[cache_key] = path
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
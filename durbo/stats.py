@@ -0,0 +1,42 @@
+from collections import deque
+from typing import Dict, Iterable
+
+DEFAULT_SAMPLE_SIZE = 1000
+PERCENTILES = (50, 90, 99)
+
+
+class RelayStats:
+    """In-process relay counters, keeps the most recent latency samples per
+    direction.
+    """
+
+    def __init__(self, sample_size: int = DEFAULT_SAMPLE_SIZE) -> None:
+        self._sample_size = sample_size
+        self._latencies = {}
+        self._counts = {}
+
+    def record(self, direction: str, elapsed_ms: float) -> None:
+        if direction not in self._latencies:
+            self._latencies[direction] = deque(maxlen=self._sample_size)
+            self._counts[direction] = 0
+
+        self._latencies[direction].append(elapsed_ms)
+        self._counts[direction] += 1
+
+    def count(self, direction: str) -> int:
+        return self._counts.get(direction, 0)
+
+    def directions(self) -> Iterable[str]:
+        return self._latencies.keys()
+
+    def percentiles(self, direction: str) -> Dict[int, float]:
+        samples = sorted(self._latencies.get(direction, ()))
+        if not samples:
+            return {}
+
+        last = len(samples) - 1
+        return {p: samples[round(last * p / 100)] for p in PERCENTILES}
+
+    def reset(self) -> None:
+        self._latencies.clear()
+        self._counts.clear()
@@ -12,6 +12,10 @@ class TgSyncer:
         self._log = logging.getLogger(__name__)
 
         self._my_id = None
+        self._simple_callback = None
+        self._edit_callback = None
+        self._delete_callback = None
+        self._command_callback = None
         self._master_id = config["master_id"]
         user = config["user"]
         session_name = user["session"]
@@ -23,6 +27,8 @@ class TgSyncer:
 
         self._client = TelegramClient(session_name, api_id, api_hash)
         self._client.add_event_handler(self._on_newmessage, events.NewMessage)
+        self._client.add_event_handler(self._on_messageedited, events.MessageEdited)
+        self._client.add_event_handler(self._on_messagedeleted, events.MessageDeleted)
 
     @property
     def client(self) -> TelegramClient:
@@ -61,10 +67,23 @@ class TgSyncer:
     def set_simple_callback(self, callback: callable) -> None:
         self._simple_callback = callback
 
+    def set_edit_callback(self, callback: callable) -> None:
+        self._edit_callback = callback
+
+    def set_delete_callback(self, callback: callable) -> None:
+        self._delete_callback = callback
+
+    def set_command_callback(self, callback: callable) -> None:
+        self._command_callback = callback
+
     async def send_text(
         self, text: str, reply_to=None, file_paths=None
     ) -> List[tl.types.Message]:
-        self._log.info("Sending %s to %s", text, self._group_id)
+        self._log.info(
+            "Sending message to %s",
+            self._group_id,
+            extra={"chat_id": self._group_id, "reply_to_id": reply_to, "body": text},
+        )
 
         sent_messages = []
 
@@ -83,6 +102,17 @@ class TgSyncer:
 
         return sent_messages
 
+    async def get_message(self, message_id: int) -> tl.types.Message:
+        return await self._client.get_messages(self._group_id, ids=message_id)
+
+    async def edit_text(self, message_id: int, text: str) -> tl.types.Message:
+        self._log.debug("Editing message %s in %s", message_id, self._group_id)
+        return await self._client.edit_message(self._group_id, message_id, text)
+
+    async def delete_messages(self, message_ids: List[int]) -> None:
+        self._log.info("Deleting %s messages in %s", len(message_ids), self._group_id)
+        await self._client.delete_messages(self._group_id, message_ids)
+
     async def _on_newmessage(self, event: events.NewMessage.Event) -> None:
         message = event.message
         sender = message.sender
@@ -95,10 +125,70 @@ class TgSyncer:
         if not name:
             name = sender.id
 
-        self._log.info("TG [%s] <%s> %s", event.chat_id, name, text or "<No text>")
+        self._log.info(
+            "TG [%s] <%s> %s",
+            event.chat_id,
+            name,
+            message.id,
+            extra={
+                "msg_id": message.id,
+                "chat_id": event.chat_id,
+                "sender_id": sender.id,
+                "body": text,
+            },
+        )
+
+        if sender.id == self._master_id and self._command_callback:
+            reply = self._command_callback(text)
+            if isawaitable(reply):
+                reply = await reply
+            if reply:
+                self._log.debug("Replying to master command")
+                await message.reply(reply, parse_mode=None)
+                return
 
         if self._simple_callback:
             cb = self._simple_callback
             r = cb(message)
             if isawaitable(r):
                 await r
+
+    async def _on_messageedited(self, event: events.MessageEdited.Event) -> None:
+        message = event.message
+        if message.out:
+            self._log.debug("Not processing edit of own message %s", message.id)
+            return
+
+        # Telegram also sends edits for e.g. link previews being filled in
+        if message.edit_date is None or message.edit_hide:
+            self._log.debug("Ignoring non-user edit of %s", message.id)
+            return
+
+        self._log.info(
+            "TG [%s] edited %s",
+            event.chat_id,
+            message.id,
+            extra={
+                "msg_id": message.id,
+                "chat_id": event.chat_id,
+                "body": message.raw_text,
+            },
+        )
+
+        if self._edit_callback:
+            r = self._edit_callback(message)
+            if isawaitable(r):
+                await r
+
+    async def _on_messagedeleted(self, event: events.MessageDeleted.Event) -> None:
+        self._log.info(
+            "TG [%s] deleted %s messages",
+            event.chat_id,
+            len(event.deleted_ids),
+            extra={"msg_ids": event.deleted_ids, "chat_id": event.chat_id},
+        )
+
+        if self._delete_callback:
+            r = self._delete_callback(event.deleted_ids, event.chat_id)
+            if isawaitable(r):
+                await r
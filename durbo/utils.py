@@ -1,7 +1,8 @@
+import hashlib
 import shutil
 from os.path import splitext
 from tempfile import mkstemp
-from typing import Any
+from typing import Any, Mapping
 from urllib.parse import urlparse
 from urllib.request import urlopen
 
@@ -39,3 +40,24 @@ def extension_from_url(url: str) -> str:
     _, ext = splitext(path)
 
     return ext[1:] or None
+
+
+REACTIONS_PREFIX = "Reactions: "
+
+
+def with_reactions(text: str, reactions: Mapping[str, int]) -> str:
+    """Replaces the reaction summary line at the end of ``text``."""
+    lines = (text or "").split("\n")
+    if lines[-1].startswith(REACTIONS_PREFIX):
+        lines = lines[:-1]
+
+    if reactions:
+        summary = " ".join(f"{emoji}×{count}" for emoji, count in reactions.items())
+        lines.append(REACTIONS_PREFIX + summary)
+
+    return "\n".join(lines)
+
+
+def relay_signature(text: str, media_id: int = None) -> str:
+    """Identifies the content of a relayed message, to tell real edits apart."""
+    return hashlib.sha1(f"{media_id}\n{text or ''}".encode()).hexdigest()
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from durbo.admin import HELP, AdminCommands
+from durbo.media import MediaTranscoder
+from durbo.stats import RelayStats
+
+
+@pytest.fixture
+def stats():
+    return RelayStats()
+
+
+@pytest.fixture
+def admin(stats):
+    loop = asyncio.new_event_loop()
+    transcoder = MediaTranscoder({'enabled': False}, loop)
+    yield AdminCommands(stats, transcoder, ':memory:', loop)
+    loop.close()
+
+
+def test_help(admin):
+    assert admin.handle('/help') == HELP
+
+
+def test_bot_name_stripped(admin):
+    assert admin.handle('/help@durbo_bot') == HELP
+
+
+@pytest.mark.parametrize('text', ['hello', '/unknown', '/', '', None, '/ help'])
+def test_non_commands_return_none(admin, text):
+    assert admin.handle(text) is None
+
+
+def test_stats(admin, stats):
+    assert admin.handle('/stats') == 'Nothing relayed yet'
+
+    stats.record('tg->fb', 10)
+
+    expected = 'tg->fb: 1 relayed, p50 10 ms, p90 10 ms, p99 10 ms'
+    assert admin.handle('/stats') == expected
+
+
+def test_pause_and_resume(admin):
+    assert admin.handle('/pause tg') == 'Relaying tg->fb paused'
+    assert admin.is_paused('tg->fb')
+    assert not admin.is_paused('fb->tg')
+
+    assert admin.handle('/resume tg') == 'Relaying tg->fb resumed'
+    assert not admin.is_paused('tg->fb')
+
+
+@pytest.mark.parametrize('text', ['/pause', '/pause both', '/resume xx'])
+def test_pause_requires_direction(admin, text):
+    assert admin.handle(text).startswith('Usage:')
+    assert not admin.is_paused('tg->fb')
+    assert not admin.is_paused('fb->tg')
+
+
+def test_flush(admin, stats):
+    stats.record('fb->tg', 5)
+
+    assert admin.handle('/flush') == 'Caches and stats flushed'
+    assert stats.count('fb->tg') == 0
@@ -0,0 +1,98 @@
+import json
+import logging
+
+import pytest
+
+from durbo.config.logging import (
+    BodyFilter,
+    JsonFormatter,
+    setup_logging,
+    stop_logging,
+)
+
+
+def make_record(**extra):
+    record = logging.LogRecord(
+        'durbo.test', logging.INFO, __file__, 1, 'hi %s', ('there',), None
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    level = root.level
+    yield root
+    stop_logging()
+    root.handlers = handlers
+    root.setLevel(level)
+
+
+def test_body_truncated_and_length_recorded():
+    record = make_record(body='x' * 10)
+
+    assert BodyFilter(max_length=4).filter(record)
+    assert record.body == 'xxxx…'
+    assert record.body_length == 10
+
+
+def test_short_body_kept():
+    record = make_record(body='short')
+
+    BodyFilter(max_length=10).filter(record)
+
+    assert record.body == 'short'
+    assert record.body_length == 5
+
+
+def test_body_sampled_out():
+    record = make_record(body='secret')
+
+    assert BodyFilter(sample_rate=0).filter(record)
+    assert record.body is None
+    assert record.body_length == 6
+
+
+def test_record_without_body_untouched():
+    record = make_record()
+
+    assert BodyFilter().filter(record)
+    assert not hasattr(record, 'body_length')
+
+
+def test_json_includes_extra_fields():
+    data = json.loads(JsonFormatter().format(make_record(msg_id=42, chat_id='abc')))
+
+    assert data['message'] == 'hi there'
+    assert data['level'] == 'INFO'
+    assert data['msg_id'] == 42
+    assert data['chat_id'] == 'abc'
+    assert 'exception' not in data
+
+
+def test_queued_exception_formatted_by_listener(root_logger, capsys):
+    setup_logging({
+        'version': 1,
+        'disable_existing_loggers': False,
+        'queue': True,
+        'formatters': {'json': {'()': 'durbo.config.logging.JsonFormatter'}},
+        'handlers': {'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+            'stream': 'ext://sys.stderr',
+        }},
+        'root': {'level': 'DEBUG', 'handlers': ['console']},
+    })
+
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        logging.getLogger('durbo.test').exception('failed %s', 1)
+
+    stop_logging()
+    data = json.loads(capsys.readouterr().err)
+
+    assert data['message'] == 'failed 1'
+    assert 'ValueError: boom' in data['exception']
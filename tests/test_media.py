@@ -0,0 +1,122 @@
+import os
+
+from PIL import Image
+
+from durbo.media import _image_digest, _transcode
+
+MAX_DIMENSION = 2048
+MAX_BYTES = 8 * 1024 * 1024
+
+
+def noise(size, mode='RGB'):
+    return Image.frombytes(mode, size, os.urandom(size[0] * size[1] * len(mode)))
+
+
+def test_webp_converted_to_png(tmp_path):
+    src = str(tmp_path / 'sticker.webp')
+    Image.new('RGBA', (32, 32), (255, 0, 0, 128)).save(src, 'WEBP')
+
+    result = _transcode(src, MAX_DIMENSION, MAX_BYTES)
+
+    assert result.endswith('.png')
+    with Image.open(result) as image:
+        assert image.format == 'PNG'
+        assert image.mode == 'RGBA'
+
+
+def test_animated_webp_converted_to_gif(tmp_path):
+    src = str(tmp_path / 'sticker.webp')
+    frames = [Image.new('RGB', (16, 16), color) for color in ('red', 'blue')]
+    frames[0].save(src, 'WEBP', save_all=True, append_images=frames[1:], duration=50)
+
+    result = _transcode(src, MAX_DIMENSION, MAX_BYTES)
+
+    with Image.open(result) as image:
+        assert image.format == 'GIF'
+        assert image.n_frames == 2
+
+
+def test_oversized_image_thumbnailed(tmp_path):
+    src = str(tmp_path / 'photo.png')
+    Image.new('RGB', (100, 50), 'green').save(src)
+
+    result = _transcode(src, 40, MAX_BYTES)
+
+    assert result != src
+    with Image.open(result) as image:
+        assert image.format == 'PNG'
+        assert image.size == (40, 20)
+
+
+def test_fitting_image_returned_unchanged(tmp_path):
+    src = str(tmp_path / 'photo.png')
+    Image.new('RGB', (100, 50), 'green').save(src)
+
+    assert _transcode(src, MAX_DIMENSION, MAX_BYTES) == src
+
+
+def test_too_large_image_recompressed_as_jpeg(tmp_path):
+    src = str(tmp_path / 'photo.png')
+    noise((256, 256)).save(src)
+    max_bytes = os.path.getsize(src) // 2
+
+    result = _transcode(src, MAX_DIMENSION, max_bytes)
+
+    assert os.path.getsize(result) <= max_bytes
+    with Image.open(result) as image:
+        assert image.format == 'JPEG'
+
+
+def test_transparency_flattened_onto_white(tmp_path):
+    src = str(tmp_path / 'screenshot.png')
+    image = noise((256, 256), 'RGBA')
+    image.paste((0, 0, 0, 0), (0, 0, 64, 64))
+    image.save(src)
+
+    result = _transcode(src, MAX_DIMENSION, os.path.getsize(src) // 2)
+
+    with Image.open(result) as image:
+        assert image.format == 'JPEG'
+        assert all(channel > 240 for channel in image.getpixel((32, 32)))
+
+
+def test_non_image_returned_unchanged(tmp_path):
+    src = tmp_path / 'notes.txt'
+    src.write_text('not an image')
+
+    assert _transcode(str(src), MAX_DIMENSION, MAX_BYTES) == str(src)
+
+
+def test_output_files_closed(tmp_path):
+    src = str(tmp_path / 'photo.png')
+    noise((128, 128)).save(src)
+    max_bytes = os.path.getsize(src) // 10
+    before = len(os.listdir('/proc/self/fd'))
+
+    for _ in range(20):
+        _transcode(src, 64, max_bytes)
+
+    assert len(os.listdir('/proc/self/fd')) == before
+
+
+def test_exif_orientation_applied(tmp_path):
+    src = str(tmp_path / 'portrait.jpg')
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new('RGB', (400, 200), 'blue').save(src, exif=exif)
+
+    result = _transcode(src, 100, MAX_BYTES)
+
+    with Image.open(result) as image:
+        assert image.size == (50, 100)
+        assert image.getexif().get(0x0112, 1) == 1
+
+
+def test_image_digest(tmp_path):
+    image = tmp_path / 'photo.png'
+    Image.new('RGB', (8, 8)).save(str(image))
+    other = tmp_path / 'archive.zip'
+    other.write_bytes(b'PK\x03\x04' + os.urandom(64))
+
+    assert len(_image_digest(str(image))) == 40
+    assert _image_digest(str(other)) is None
@@ -0,0 +1,104 @@
+import pytest
+
+from durbo.data.base import database, init as init_db
+from durbo.data.models import MessageData, create_tables
+
+
+@pytest.fixture(autouse=True)
+def db():
+    init_db(':memory:')
+    create_tables()
+    yield database
+    database.close()
+
+
+def add(tg_message_id, fb_message_id, tg_chat_id=-100):
+    return MessageData.create(
+        tg_message_id=tg_message_id,
+        tg_sender_id=1,
+        tg_chat_id=tg_chat_id,
+        fb_message_id=fb_message_id,
+        fb_sender_id='2',
+        fb_thread_id='3',
+    )
+
+
+def tg_ids(rows):
+    return sorted(row.tg_message_id for row in rows)
+
+
+def test_for_tg_messages():
+    add(1, 'mid.1')
+    add(2, 'mid.2')
+    add(3, 'mid.3')
+
+    assert tg_ids(MessageData.for_tg_messages([1, 3, 4])) == [1, 3]
+
+
+def test_for_tg_messages_filters_chat():
+    add(1, 'mid.1', tg_chat_id=-100)
+    add(1, 'mid.2', tg_chat_id=-200)
+
+    rows = MessageData.for_tg_messages([1], -200)
+
+    assert [row.fb_message_id for row in rows] == ['mid.2']
+    assert len(MessageData.for_tg_messages([1])) == 2
+
+
+def test_for_tg_messages_accepts_more_ids_than_sqlite_variables():
+    add(1, 'mid.1')
+    add(5000, 'mid.5000')
+
+    assert tg_ids(MessageData.for_tg_messages(range(1, 5001), -100)) == [1, 5000]
+
+
+def test_for_fb_message():
+    add(1, 'mid.1')
+    add(2, 'mid.1')
+    add(3, 'mid.3')
+
+    assert tg_ids(MessageData.for_fb_message('mid.1')) == [1, 2]
+
+
+def test_delete_tg_messages():
+    for i in range(1, 1201):
+        add(i, f'mid.{i}')
+    add(1, 'mid.other', tg_chat_id=-200)
+
+    assert MessageData.delete_tg_messages(range(1, 1101), -100) == 1100
+    assert MessageData.select().count() == 101
+    assert len(MessageData.for_tg_messages([1])) == 1
+
+
+def test_delete_fb_messages():
+    add(1, 'mid.1')
+    add(2, 'mid.1')
+    add(3, 'mid.3')
+    add(4, 'mid.4')
+
+    assert MessageData.delete_fb_messages(['mid.1', 'mid.4', 'mid.5']) == 3
+    assert tg_ids(MessageData.select()) == [3]
+
+
+def test_delete_fb_messages_keeps_new_copy_of_edited_message():
+    add(1, 'mid.old')
+    old_rows = MessageData.for_tg_messages([1])
+    add(1, 'mid.new')
+
+    MessageData.delete_fb_messages(row.fb_message_id for row in old_rows)
+
+    assert [row.fb_message_id for row in MessageData.select()] == ['mid.new']
+
+
+def test_create_tables_adds_missing_columns():
+    database.drop_tables([MessageData])
+    database.execute_sql(
+        'CREATE TABLE messagedata (id INTEGER PRIMARY KEY, tg_message_id INTEGER,'
+        ' tg_sender_id INTEGER, tg_chat_id INTEGER, fb_message_id VARCHAR(255),'
+        ' fb_sender_id VARCHAR(255), fb_thread_id VARCHAR(255))'
+    )
+
+    create_tables()
+    add(1, 'mid.1')
+
+    assert MessageData.get().tg_signature is None
@@ -0,0 +1,39 @@
+from durbo.stats import RelayStats
+
+
+def test_percentiles():
+    stats = RelayStats()
+    for ms in range(1, 101):
+        stats.record('tg->fb', ms)
+
+    assert stats.percentiles('tg->fb') == {50: 51, 90: 90, 99: 99}
+    assert stats.count('tg->fb') == 100
+
+
+def test_percentiles_single_sample():
+    stats = RelayStats()
+    stats.record('fb->tg', 12.5)
+
+    assert stats.percentiles('fb->tg') == {50: 12.5, 90: 12.5, 99: 12.5}
+
+
+def test_percentiles_unknown_direction():
+    assert RelayStats().percentiles('tg->fb') == {}
+
+
+def test_samples_bounded_but_count_kept():
+    stats = RelayStats(sample_size=10)
+    for ms in range(100):
+        stats.record('tg->fb', ms)
+
+    assert stats.count('tg->fb') == 100
+    assert stats.percentiles('tg->fb')[50] >= 90
+
+
+def test_reset():
+    stats = RelayStats()
+    stats.record('tg->fb', 1)
+    stats.reset()
+
+    assert stats.count('tg->fb') == 0
+    assert list(stats.directions()) == []
@@ -0,0 +1,34 @@
+from collections import Counter
+
+from durbo.utils import relay_signature, with_reactions
+
+
+def test_reactions_appended():
+    text = with_reactions('<**Bob**>\nhello', Counter({'👍': 2, '❤': 1}))
+
+    assert text == '<**Bob**>\nhello\nReactions: 👍×2 ❤×1'
+
+
+def test_reactions_replaced():
+    text = with_reactions('<**Bob**>\nhello\nReactions: 👍×2', Counter({'😮': 1}))
+
+    assert text == '<**Bob**>\nhello\nReactions: 😮×1'
+
+
+def test_reactions_removed():
+    text = with_reactions('<**Bob**>\nhello\nReactions: 👍×1', Counter())
+
+    assert text == '<**Bob**>\nhello'
+
+
+def test_reactions_on_message_without_text():
+    assert with_reactions(None, Counter({'👍': 1})) == '\nReactions: 👍×1'
+
+
+def test_relay_signature_changes_with_text_and_media():
+    signature = relay_signature('hello', 1)
+
+    assert relay_signature('hello', 1) == signature
+    assert relay_signature('hello!', 1) != signature
+    assert relay_signature('hello', 2) != signature
+    assert relay_signature(None) == relay_signature('')